@@ -5,8 +5,17 @@ from .server import main
 # This file serves as the entry point when the package is executed with `python -m discord_mcp`.
 # This resolves the RuntimeWarning related to 'runpy' and module execution order.
 if __name__ == "__main__":
+    # Use uvloop's faster event loop where it is available (it does not support Windows).
+    run = asyncio.run
+    if sys.platform != "win32":
+        try:
+            import uvloop
+            run = uvloop.run
+        except ImportError:
+            pass
+
     try:
-        asyncio.run(main())
+        run(main())
     except KeyboardInterrupt:
         print("Shutting down server.")
         sys.exit(0)
\ No newline at end of file
@@ -1,11 +1,44 @@
 import random
+from typing import Optional
+
+# Dedicated generator for word selection, independent of the shared module-level instance
+_rng = random.Random()
+
+# Shared glyphs for the frame border and lives display
+_BORDER = "║"
+_HEART, _BLACK_HEART = "❤️", "🖤"
+
+# The retro terminal frame around the game state. Art and lives are filled in once
+# per attempts-left value; word and incorrect guesses are left open for each render.
+_FRAME_TEMPLATE = "```\n" + "\n".join([
+    "╔═══════════════════════════════╗",
+    "║         H A N G M A N         ║",
+    "╠═══════════════════════════════╣",
+    "║                               ║",
+    "{art}",
+    "║                               ║",
+    "╠═══════════════════════════════╣",
+    "║  Word:  {{word:<21}} ║",
+    "║                               ║",
+    "║  Incorrect: {{incorrect:<17}} ║",
+    "║                               ║",
+    "║  Lives: {lives} ║",
+    "╚═══════════════════════════════╝"
+]) + "\n```"
 
 class HangmanGame:
     """
     Manages the state and logic for a single game of Hangman.
     """
-    
-    WORDS = [
+
+    __slots__ = (
+        "word", "attempts_left", "_word_mask", "_spaced_word", "_hidden",
+        "_correct", "_wrong", "_incorrect_str", "_display_cache",
+        "_display_cache_mask", "_won", "_lost", "_msg_cache_key",
+        "_msg_cache_value"
+    )
+
+    WORDS = (
         # Well-known animals of varying difficulty
         "alligator", "alpaca", "badger", "beaver", "bison", "bobcat",
         "butterfly", "camel", "caterpillar", "cheetah", "chicken",
@@ -18,7 +51,7 @@ class HangmanGame:
         "rhinoceros", "scorpion", "shark", "sheep", "skunk", "sloth",
         "snake", "spider", "squid", "squirrel", "tiger", "turtle",
         "vulture", "weasel", "whale", "wolf", "wombat", "zebra"
-    ]
+    )
 
 
     HANGMAN_PICS = [
@@ -100,68 +133,101 @@ class HangmanGame:
          =========
         """
     ]
+    _MAX_ATTEMPTS = len(HANGMAN_PICS) - 1
+
+    # Each picture split into lines and padded for centering inside the frame
+    _PADDED_ART = tuple(
+        "\n".join(f"{_BORDER} {line:<28} {_BORDER}" for line in pic.strip().split('\n'))
+        for pic in HANGMAN_PICS
+    )
 
-    def __init__(self):
-        self.word = random.choice(self.WORDS).lower()
-        self.guesses_correct = set()
-        self.guesses_incorrect = set()
-        self.attempts_left = len(self.HANGMAN_PICS) - 1
+    # Padded lives display indexed by attempts left
+    _LIVES = tuple(
+        f"{_HEART * left + _BLACK_HEART * lost:<18}"
+        for left, lost in zip(range(_MAX_ATTEMPTS + 1), range(_MAX_ATTEMPTS, -1, -1))
+    )
+
+    # Framed art and lives indexed by attempts left, awaiting only word and incorrect guesses
+    _FRAMES = tuple(
+        _FRAME_TEMPLATE.format(art=art, lives=lives)
+        for art, lives in zip(reversed(_PADDED_ART), _LIVES)
+    )
+
+    def __init__(self, word: str):
+        if not (word.isascii() and word.isalpha() and word.islower()):
+            raise ValueError(f"Hangman words must be lowercase a-z letters, got {word!r}")
+        self.word = word
+        # Guesses are tracked as 26-bit masks, bit i standing for chr(ord('a') + i)
+        self._word_mask = 0
+        for letter in self.word:
+            self._word_mask |= 1 << (ord(letter) - 97)
+        # Unguessed letters are translated to underscores; entries are dropped as they are guessed
+        self._spaced_word = " ".join(self.word)
+        self._hidden = {ord(letter): "_" for letter in set(self.word)}
+        self._correct = 0
+        self._wrong = 0
+        self._incorrect_str = ""
+        self._display_cache = None
+        self._display_cache_mask = -1
+        self.attempts_left = self._MAX_ATTEMPTS
+        self._won = False
+        self._lost = False
+        self._msg_cache_key = None
+        self._msg_cache_value = None
+
+    @classmethod
+    def new(cls, word: Optional[str] = None) -> "HangmanGame":
+        """Starts a game with the given word, or a random one from WORDS."""
+        return cls(word if word is not None else _rng.choice(cls.WORDS))
 
     def guess(self, letter: str) -> bool:
         """Processes a single letter guess, updating the game state."""
-        letter = letter.lower()
-        if letter in self.word:
-            self.guesses_correct.add(letter)
+        # Setting bit 5 lowercases an ASCII letter without a full str.lower() call
+        code = ord(letter) | 0x20
+        if not 97 <= code <= 122:
+            return False
+        bit = 1 << (code - 97)
+        if bit & self._word_mask:
+            self._correct |= bit
+            self._hidden.pop(code, None)
+            self._won = (self._word_mask & self._correct) == self._word_mask
             return True
         else:
-            if letter not in self.guesses_incorrect:
-                self.guesses_incorrect.add(letter)
+            # Once lost, attempts_left stays at 0 so it can index the frames directly
+            if not bit & self._wrong and not self._lost:
+                self._wrong |= bit
+                self._incorrect_str = ' '.join([chr(97 + i) for i in range(26) if self._wrong >> i & 1])
                 self.attempts_left -= 1
+                self._lost = self.attempts_left <= 0
             return False
 
     def is_won(self) -> bool:
         """Checks if the game has been won."""
-        return set(self.word) <= self.guesses_correct
+        return self._won
 
     def is_lost(self) -> bool:
         """Checks if the game has been lost."""
-        return self.attempts_left <= 0
+        return self._lost
 
     def get_display_word(self) -> str:
         """Returns the word with unguessed letters as underscores."""
-        return " ".join([letter if letter in self.guesses_correct else "_" for letter in self.word])
+        correct = self._correct
+        # Only a new correct letter changes the display, so reuse it otherwise
+        if correct != self._display_cache_mask:
+            self._display_cache = self._spaced_word.translate(self._hidden)
+            self._display_cache_mask = correct
+        return self._display_cache
 
     def get_game_state_message(self) -> str:
         """Constructs the message to display the current game state within a retro terminal frame."""
-        display_word = self.get_display_word()
-        hangman_art_index = len(self.HANGMAN_PICS) - 1 - self.attempts_left
-        hangman_art_index = max(0, min(hangman_art_index, len(self.HANGMAN_PICS) - 1))
-        
-        # Split the hangman art into lines and pad it for centering
-        hangman_art_lines = self.HANGMAN_PICS[hangman_art_index].strip().split('\n')
-        padded_art_lines = [f"║ {line.ljust(28)} ║" for line in hangman_art_lines]
-        
-        lives_display = '❤️' * self.attempts_left + '🖤' * (len(self.HANGMAN_PICS) - 1 - self.attempts_left)
-        incorrect_guesses_str = ' '.join(sorted(self.guesses_incorrect))
-
-        # Build the framed message
-        message_lines = [
-            "╔═══════════════════════════════╗",
-            "║         H A N G M A N         ║",
-            "╠═══════════════════════════════╣",
-            "║                               ║",
-            *padded_art_lines,
-            "║                               ║",
-            "╠═══════════════════════════════╣",
-            f"║  Word:  {display_word.ljust(21)} ║",
-            "║                               ║",
-            f"║  Incorrect: {incorrect_guesses_str.ljust(17)} ║",
-            "║                               ║",
-            f"║  Lives: {lives_display.ljust(18)} ║",
-            "╚═══════════════════════════════╝"
-        ]
-        
-        message = "```\n" + "\n".join(message_lines) + "\n```"
+        key = (self.attempts_left, self._correct, self._wrong)
+        if key == self._msg_cache_key:
+            return self._msg_cache_value
+
+        message = self._FRAMES[self.attempts_left].format(
+            word=self.get_display_word(),
+            incorrect=self._incorrect_str
+        )
 
         if self.is_won():
             message += f"\n**Congratulations! You won! The word was `{self.word}`.**"
@@ -170,4 +236,9 @@ class HangmanGame:
         else:
             message += "\nType a letter to guess."
 
-        return message
\ No newline at end of file
+        self._msg_cache_key = key
+        self._msg_cache_value = message
+        return message
+
+# Words are used as-is, and the guess masks only cover a-z
+assert all(word.isascii() and word.isalpha() and word.islower() for word in HangmanGame.WORDS)
@@ -2,7 +2,7 @@ import os
 import sys
 import asyncio
 import logging
-from datetime import datetime
+from datetime import datetime, timedelta
 from typing import Any, List
 from functools import wraps
 import discord
@@ -12,15 +12,25 @@ from mcp.types import Tool, TextContent
 from mcp.server.stdio import stdio_server
 import websockets
 import json
+try:
+    import orjson
+except ImportError:  # Optional speedup; fall back to the stdlib encoder
+    orjson = None
 import argparse
 import aiohttp # For downloading images
 import uuid # For unique filenames
 from .game import HangmanGame
-from .vision_analyzer import analyse_image # Import our new module
+from .vision_analyzer import analyse_images # Import our new module
 
 
-# Configure logging
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+def json_dumps(obj) -> str:
+    """Serializes obj to a JSON text frame, using orjson when available."""
+    if orjson is not None:
+        return orjson.dumps(obj).decode()
+    return json.dumps(obj)
+
+# Configure logging. Logs go to stderr because stdout carries the MCP stdio protocol.
+logging.basicConfig(stream=sys.stderr, level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger("discord-mcp-server")
 
 # Discord bot setup
@@ -29,23 +39,49 @@ if not DISCORD_TOKEN:
     raise ValueError("DISCORD_TOKEN environment variable is required")
 
 # The channels the bot will listen to for messages and commands.
-TARGET_CHANNEL_IDS = []
+TARGET_CHANNEL_IDS = frozenset()
+
+# Prompt sent to the LLM for each forwarded Discord message
+FORWARD_TEMPLATE = (
+    "MESSAGE FROM DISCORD_USER '{name}' "
+    "in DISCORD_CHANNEL '{channel_id}' "
+    "MSG: \"{content}\""
+    "{attachments}"
+    "\n\n**CRITICAL INSTRUCTIONS:**\n"
+    "1. **Process All Content:** If the message includes URLs or attachments, you MUST use your tools to fetch and understand their content (e.g., scrape webpages, view images) before responding.\n"
+    "2. **Analyse with Intent:** Do not just describe *what* you see. Your primary goal is to understand *why* the user sent this. Consider the context, infer the user's purpose or question, and anticipate their next step. Your response should focus on meaning and insight, not just description.\n"
+    "3. **Communicate via Edit:** You MUST use the 'edit_message' tool on the placeholder message with ID: {thinking_id}. Do not use any other response tool."
+)
 
 # Initialize Discord bot with necessary intents
 intents = discord.Intents.default()
 intents.message_content = True
 intents.members = True
-bot = commands.Bot(command_prefix="!", intents=intents)
+# The default help command is not used; only the hangman and look commands are registered
+bot = commands.Bot(command_prefix="!", intents=intents, help_command=None)
 
 # Initialize MCP server
 app = Server("discord-server")
 
+# Outbound WebSocket batching: payloads queued within WS_BATCH_DELAY of each other
+# are sent together as one {"type": "batch", "items": [...]} frame.
+WS_OUTBOX_MAXSIZE = 1024
+WS_BATCH_SIZE = 128
+WS_BATCH_DELAY = 0.001  # seconds
+
+# Hangman guesses are deleted in bulk, at most BULK_DELETE_LIMIT (Discord's cap) per request
+BULK_DELETE_LIMIT = 100
+DELETE_FLUSH_DELAY = 0.5  # seconds
+
 # --- State Management ---
 class BotState:
     def __init__(self):
         self.websocket_client = None
         self.websocket_server = None
+        self.ws_outbox = None  # Outbox of the current connection: (payload, thinking_message) pairs
         self.active_hangman_games = {}  # {channel_id: (game_instance, message_instance)}
+        self.pending_deletes = {}  # {channel_id: [message, ...]}
+        self.delete_tasks = {}  # {channel_id: flush_task}
 
 state = BotState()
 
@@ -69,13 +105,13 @@ async def on_ready():
     global discord_client
     discord_client = bot
     logger.info(f"Logged in as {bot.user.name} (ID: {bot.user.id})")
-    logger.info(f"Listening in channels: {', '.join(TARGET_CHANNEL_IDS)}")
+    logger.info(f"Listening in channels: {', '.join(map(str, TARGET_CHANNEL_IDS))}")
     logger.info('------')
 
 @bot.command(name="hangman")
 async def hangman(ctx, *args):
     """Starts or interacts with a game of Hangman."""
-    channel_id = str(ctx.channel.id)
+    channel_id = ctx.channel.id
     command = args[0].lower() if args else "start"
 
     if command == "start":
@@ -83,33 +119,59 @@ async def hangman(ctx, *args):
             await ctx.send("A game is already in progress in this channel! Use `!hangman stop` to end it.")
             return
         
-        game = HangmanGame()
+        game = HangmanGame.new()
         game_message = await ctx.send(game.get_game_state_message())
         state.active_hangman_games[channel_id] = (game, game_message)
         logger.info(f"Started Hangman game in channel {channel_id}")
 
     elif command == "stop":
-        if channel_id in state.active_hangman_games:
-            del state.active_hangman_games[channel_id]
+        if state.active_hangman_games.pop(channel_id, None) is not None:
             await ctx.send("Hangman game stopped.")
             logger.info(f"Stopped Hangman game in channel {channel_id}")
         else:
             await ctx.send("No active game to stop in this channel.")
 
+def queue_message_delete(message):
+    """Queues a message for bulk deletion, scheduling a flush for its channel if none is pending."""
+    channel_id = message.channel.id
+    state.pending_deletes.setdefault(channel_id, []).append(message)
+    if channel_id not in state.delete_tasks:
+        state.delete_tasks[channel_id] = asyncio.create_task(flush_pending_deletes(message.channel))
+
+async def flush_pending_deletes(channel):
+    """Deletes a channel's queued messages with as few bulk delete requests as possible."""
+    await asyncio.sleep(DELETE_FLUSH_DELAY)
+    # Detach the batch first so messages queued during the requests start a new flush
+    del state.delete_tasks[channel.id]
+    messages = state.pending_deletes.pop(channel.id, [])
+
+    # Guesses are only ever a moment old, well inside the 14-day bulk delete window
+    for start in range(0, len(messages), BULK_DELETE_LIMIT):
+        try:
+            await channel.delete_messages(messages[start:start + BULK_DELETE_LIMIT])
+        except discord.errors.Forbidden:
+            logger.warning(f"Could not delete messages in channel {channel.id}. Missing permissions.")
+            return
+        except discord.errors.HTTPException as e:
+            logger.warning(f"Failed to delete messages in channel {channel.id}: {e}")
+
 @bot.event
 async def on_message(message):
     # Ignore messages from the bot itself or from channels not in the target list
-    if message.author.bot or str(message.channel.id) not in TARGET_CHANNEL_IDS:
+    if message.author.bot or message.channel.id not in TARGET_CHANNEL_IDS:
         return
 
-    # Always process commands first
-    await bot.process_commands(message)
+    # Only run the command framework for messages that can actually be commands
+    if message.content.startswith(bot.command_prefix):
+        await bot.process_commands(message)
+        return
 
-    channel_id = str(message.channel.id)
+    channel_id = message.channel.id
+    hangman_entry = state.active_hangman_games.get(channel_id)
 
     # Handle hangman guesses
-    if channel_id in state.active_hangman_games and not message.content.startswith(bot.command_prefix):
-        game, game_message = state.active_hangman_games[channel_id]
+    if hangman_entry is not None:
+        game, game_message = hangman_entry
         
         guess = message.content.strip().lower()
         if len(guess) == 1 and guess.isalpha():
@@ -118,60 +180,52 @@ async def on_message(message):
             
             if game.is_won() or game.is_lost():
                 del state.active_hangman_games[channel_id]
-        
-        try:
-            await message.delete()
-        except discord.errors.Forbidden:
-            logger.warning(f"Could not delete message in channel {channel_id}. Missing permissions.")
+
+        queue_message_delete(message)
         return # Stop further processing
 
-    # If it's not a command and not a hangman guess, handle as a regular message to the LLM
-    if not message.content.startswith(bot.command_prefix) and channel_id not in state.active_hangman_games:
-        logger.info(f"Message from {message.author.name}: '{message.content}'")
+    # Otherwise, handle it as a regular message to the LLM
+    logger.info(f"Message from {message.author.name}: '{message.content}'")
 
-        thinking_message = None # Initialize to None
-        try:
-            # Send an initial "Thinking..." message
-            thinking_message = await message.channel.send("🤔Thinking...")
+    thinking_message = None # Initialize to None
+    try:
+        # Send an initial "Thinking..." message
+        thinking_message = await message.channel.send("🤔Thinking...")
+        
+        outbox = state.ws_outbox
+        if state.websocket_client and outbox is not None:
+            logger.info("Formatting and forwarding message to WebSocket.")
             
-            if state.websocket_client:
-                logger.info("Formatting and forwarding message to WebSocket.")
-                
-                formatted_content = (
-                    f"MESSAGE FROM DISCORD_USER '{message.author.display_name}' "
-                    f"in DISCORD_CHANNEL '{message.channel.id}' "
-                    f"MSG: \"{message.content}\""
-                )
+            attachments = ""
+            if message.attachments:
+                attachments = "\nATTACHMENTS: " + ", ".join([att.url for att in message.attachments])
 
-                if message.attachments:
-                    attachment_urls = [att.url for att in message.attachments]
-                    formatted_content += "\nATTACHMENTS: " + ", ".join(attachment_urls)
-
-                formatted_content += (
-                    f"\n\n**CRITICAL INSTRUCTIONS:**\n"
-                    f"1. **Process All Content:** If the message includes URLs or attachments, you MUST use your tools to fetch and understand their content (e.g., scrape webpages, view images) before responding.\n"
-                    f"2. **Analyse with Intent:** Do not just describe *what* you see. Your primary goal is to understand *why* the user sent this. Consider the context, infer the user's purpose or question, and anticipate their next step. Your response should focus on meaning and insight, not just description.\n"
-                    f"3. **Communicate via Edit:** You MUST use the 'edit_message' tool on the placeholder message with ID: {thinking_message.id}. Do not use any other response tool."
-                )
-                
-                payload = {
-                    "type": "message",
-                    "content": formatted_content,
-                    "channelId": str(message.channel.id),
-                    "thinkingMessageId": str(thinking_message.id)
-                }
-                await state.websocket_client.send(json.dumps(payload))
-            else:
-                logger.warning("Cannot forward message: WebSocket is not connected.")
-                if thinking_message: # Only delete if it was successfully sent
-                    await thinking_message.delete()
-        except Exception as e:
-            logger.error(f"Error processing message for LLM forwarding: {e}", exc_info=True)
-            if thinking_message:
-                try:
-                    await thinking_message.edit(content=f"An error occurred while processing your message: {e}")
-                except Exception as edit_e:
-                    logger.error(f"Failed to edit thinking message after error: {edit_e}", exc_info=True)
+            formatted_content = FORWARD_TEMPLATE.format_map({
+                "name": message.author.display_name,
+                "channel_id": message.channel.id,
+                "content": message.content,
+                "attachments": attachments,
+                "thinking_id": thinking_message.id
+            })
+            
+            payload = {
+                "type": "message",
+                "content": formatted_content,
+                "channelId": str(message.channel.id),
+                "thinkingMessageId": str(thinking_message.id)
+            }
+            await outbox.put((payload, thinking_message))
+        else:
+            logger.warning("Cannot forward message: WebSocket is not connected.")
+            if thinking_message: # Only delete if it was successfully sent
+                await thinking_message.delete()
+    except Exception as e:
+        logger.error(f"Error processing message for LLM forwarding: {e}", exc_info=True)
+        if thinking_message:
+            try:
+                await thinking_message.edit(content=f"An error occurred while processing your message: {e}")
+            except Exception as edit_e:
+                logger.error(f"Failed to edit thinking message after error: {edit_e}", exc_info=True)
 
 # Helper function to ensure Discord client is ready
 def require_discord_client(func):
@@ -182,590 +236,620 @@ def require_discord_client(func):
         return await func(*args, **kwargs)
     return wrapper
 
-@app.list_tools()
-async def list_tools() -> List[Tool]:
-    """List available Discord tools."""
-    return [
-        # Server Information Tools
-        Tool(
-            name="get_server_info",
-            description="Get information about a Discord server",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "server_id": {
-                        "type": "string",
-                        "description": "Discord server (guild) ID"
-                    }
+# Helper function to name a reaction emoji: custom emoji name, then ID, then the Unicode character
+def _emoji_str(emoji):
+    return str(getattr(emoji, 'name', None) or getattr(emoji, 'id', None) or emoji)
+
+# Cache-first lookups: use the gateway-populated cache and only hit the REST API on a miss
+async def _get_channel(channel_id):
+    channel_id = int(channel_id)
+    return discord_client.get_channel(channel_id) or await discord_client.fetch_channel(channel_id)
+
+async def _get_guild(guild_id):
+    guild_id = int(guild_id)
+    return discord_client.get_guild(guild_id) or await discord_client.fetch_guild(guild_id)
+
+async def _get_user(user_id):
+    user_id = int(user_id)
+    return discord_client.get_user(user_id) or await discord_client.fetch_user(user_id)
+
+async def _get_member(guild, user_id):
+    user_id = int(user_id)
+    return guild.get_member(user_id) or await guild.fetch_member(user_id)
+
+async def _get_message(channel_id, message_id):
+    channel = await _get_channel(channel_id)
+    return channel, await channel.fetch_message(int(message_id))
+
+# The tool definitions never change, so they are built once at import
+TOOLS: List[Tool] = [
+    # Server Information Tools
+    Tool(
+        name="get_server_info",
+        description="Get information about a Discord server",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "server_id": {
+                    "type": "string",
+                    "description": "Discord server (guild) ID"
+                }
+            },
+            "required": ["server_id"]
+        }
+    ),
+    Tool(
+        name="get_channels",
+        description="Get a list of all channels in a Discord server",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "server_id": {
+                    "type": "string",
+                    "description": "Discord server (guild) ID"
+                }
+            },
+            "required": ["server_id"]
+        }
+    ),
+    Tool(
+        name="list_members",
+        description="Get a list of members in a server",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "server_id": {
+                    "type": "string",
+                    "description": "Discord server (guild) ID"
                 },
-                "required": ["server_id"]
-            }
-        ),
-        Tool(
-            name="get_channels",
-            description="Get a list of all channels in a Discord server",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "server_id": {
-                        "type": "string",
-                        "description": "Discord server (guild) ID"
-                    }
+                "limit": {
+                    "type": "number",
+                    "description": "Maximum number of members to fetch",
+                    "minimum": 1,
+                    "maximum": 1000
+                }
+            },
+            "required": ["server_id"]
+        }
+    ),
+
+    # Role Management Tools
+    Tool(
+        name="add_role",
+        description="Add a role to a user",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "server_id": {
+                    "type": "string",
+                    "description": "Discord server ID"
                 },
-                "required": ["server_id"]
-            }
-        ),
-        Tool(
-            name="list_members",
-            description="Get a list of members in a server",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "server_id": {
-                        "type": "string",
-                        "description": "Discord server (guild) ID"
-                    },
-                    "limit": {
-                        "type": "number",
-                        "description": "Maximum number of members to fetch",
-                        "minimum": 1,
-                        "maximum": 1000
-                    }
+                "user_id": {
+                    "type": "string",
+                    "description": "User to add role to"
                 },
-                "required": ["server_id"]
-            }
-        ),
-
-        # Role Management Tools
-        Tool(
-            name="add_role",
-            description="Add a role to a user",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "server_id": {
-                        "type": "string",
-                        "description": "Discord server ID"
-                    },
-                    "user_id": {
-                        "type": "string",
-                        "description": "User to add role to"
-                    },
-                    "role_id": {
-                        "type": "string",
-                        "description": "Role ID to add"
-                    }
+                "role_id": {
+                    "type": "string",
+                    "description": "Role ID to add"
+                }
+            },
+            "required": ["server_id", "user_id", "role_id"]
+        }
+    ),
+    Tool(
+        name="remove_role",
+        description="Remove a role from a user",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "server_id": {
+                    "type": "string",
+                    "description": "Discord server ID"
                 },
-                "required": ["server_id", "user_id", "role_id"]
-            }
-        ),
-        Tool(
-            name="remove_role",
-            description="Remove a role from a user",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "server_id": {
-                        "type": "string",
-                        "description": "Discord server ID"
-                    },
-                    "user_id": {
-                        "type": "string",
-                        "description": "User to remove role from"
-                    },
-                    "role_id": {
-                        "type": "string",
-                        "description": "Role ID to remove"
-                    }
+                "user_id": {
+                    "type": "string",
+                    "description": "User to remove role from"
                 },
-                "required": ["server_id", "user_id", "role_id"]
-            }
-        ),
-
-        # Channel Management Tools
-        Tool(
-            name="create_text_channel",
-            description="Create a new text channel",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "server_id": {
-                        "type": "string",
-                        "description": "Discord server ID"
-                    },
-                    "name": {
-                        "type": "string",
-                        "description": "Channel name"
-                    },
-                    "category_id": {
-                        "type": "string",
-                        "description": "Optional category ID to place channel in"
-                    },
-                    "topic": {
-                        "type": "string",
-                        "description": "Optional channel topic"
-                    }
+                "role_id": {
+                    "type": "string",
+                    "description": "Role ID to remove"
+                }
+            },
+            "required": ["server_id", "user_id", "role_id"]
+        }
+    ),
+
+    # Channel Management Tools
+    Tool(
+        name="create_text_channel",
+        description="Create a new text channel",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "server_id": {
+                    "type": "string",
+                    "description": "Discord server ID"
                 },
-                "required": ["server_id", "name"]
-            }
-        ),
-        Tool(
-            name="delete_channel",
-            description="Delete a channel",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "channel_id": {
-                        "type": "string",
-                        "description": "ID of channel to delete"
-                    },
-                    "reason": {
-                        "type": "string",
-                        "description": "Reason for deletion"
-                    }
+                "name": {
+                    "type": "string",
+                    "description": "Channel name"
                 },
-                "required": ["channel_id"]
-            }
-        ),
-
-        # Message Reaction Tools
-        Tool(
-            name="add_reaction",
-            description="Add a reaction to a message",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "channel_id": {
-                        "type": "string",
-                        "description": "Channel containing the message"
-                    },
-                    "message_id": {
-                        "type": "string",
-                        "description": "Message to react to"
-                    },
-                    "emoji": {
-                        "type": "string",
-                        "description": "Emoji to react with (Unicode or custom emoji ID)"
-                    }
+                "category_id": {
+                    "type": "string",
+                    "description": "Optional category ID to place channel in"
                 },
-                "required": ["channel_id", "message_id", "emoji"]
-            }
-        ),
-        Tool(
-            name="add_multiple_reactions",
-            description="Add multiple reactions to a message",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "channel_id": {
-                        "type": "string",
-                        "description": "Channel containing the message"
-                    },
-                    "message_id": {
-                        "type": "string",
-                        "description": "Message to react to"
-                    },
-                    "emojis": {
-                        "type": "array",
-                        "items": {
-                            "type": "string",
-                            "description": "Emoji to react with (Unicode or custom emoji ID)"
-                        },
-                        "description": "List of emojis to add as reactions"
-                    }
+                "topic": {
+                    "type": "string",
+                    "description": "Optional channel topic"
+                }
+            },
+            "required": ["server_id", "name"]
+        }
+    ),
+    Tool(
+        name="delete_channel",
+        description="Delete a channel",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "channel_id": {
+                    "type": "string",
+                    "description": "ID of channel to delete"
                 },
-                "required": ["channel_id", "message_id", "emojis"]
-            }
-        ),
-        Tool(
-            name="remove_reaction",
-            description="Remove a reaction from a message",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "channel_id": {
-                        "type": "string",
-                        "description": "Channel containing the message"
-                    },
-                    "message_id": {
-                        "type": "string",
-                        "description": "Message to remove reaction from"
-                    },
-                    "emoji": {
-                        "type": "string",
-                        "description": "Emoji to remove (Unicode or custom emoji ID)"
-                    }
+                "reason": {
+                    "type": "string",
+                    "description": "Reason for deletion"
+                }
+            },
+            "required": ["channel_id"]
+        }
+    ),
+
+    # Message Reaction Tools
+    Tool(
+        name="add_reaction",
+        description="Add a reaction to a message",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "channel_id": {
+                    "type": "string",
+                    "description": "Channel containing the message"
                 },
-                "required": ["channel_id", "message_id", "emoji"]
-            }
-        ),
-        Tool(
-            name="send_message",
-            description="Send a message to a specific channel",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "channel_id": {
-                        "type": "string",
-                        "description": "Discord channel ID"
-                    },
-                    "content": {
-                        "type": "string",
-                        "description": "Message content"
-                    }
+                "message_id": {
+                    "type": "string",
+                    "description": "Message to react to"
                 },
-                "required": ["channel_id", "content"]
-            }
-        ),
-        Tool(
-            name="read_messages",
-            description="Read recent messages from a channel",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "channel_id": {
-                        "type": "string",
-                        "description": "Discord channel ID"
-                    },
-                    "limit": {
-                        "type": "number",
-                        "description": "Number of messages to fetch (max 100)",
-                        "minimum": 1,
-                        "maximum": 100
-                    }
+                "emoji": {
+                    "type": "string",
+                    "description": "Emoji to react with (Unicode or custom emoji ID)"
+                }
+            },
+            "required": ["channel_id", "message_id", "emoji"]
+        }
+    ),
+    Tool(
+        name="add_multiple_reactions",
+        description="Add multiple reactions to a message",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "channel_id": {
+                    "type": "string",
+                    "description": "Channel containing the message"
                 },
-                "required": ["channel_id"]
-            }
-        ),
-        Tool(
-            name="get_user_info",
-            description="Get information about a Discord user",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "user_id": {
-                        "type": "string",
-                        "description": "Discord user ID"
-                    }
+                "message_id": {
+                    "type": "string",
+                    "description": "Message to react to"
                 },
-                "required": ["user_id"]
-            }
-        ),
-        Tool(
-            name="moderate_message",
-            description="Delete a message and optionally timeout the user",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "channel_id": {
-                        "type": "string",
-                        "description": "Channel ID containing the message"
-                    },
-                    "message_id": {
-                        "type": "string",
-                        "description": "ID of message to moderate"
-                    },
-                    "reason": {
+                "emojis": {
+                    "type": "array",
+                    "items": {
                         "type": "string",
-                        "description": "Reason for moderation"
+                        "description": "Emoji to react with (Unicode or custom emoji ID)"
                     },
-                    "timeout_minutes": {
-                        "type": "number",
-                        "description": "Optional timeout duration in minutes",
-                        "minimum": 0,
-                        "maximum": 40320  # Max 4 weeks
-                    }
+                    "description": "List of emojis to add as reactions"
+                }
+            },
+            "required": ["channel_id", "message_id", "emojis"]
+        }
+    ),
+    Tool(
+        name="remove_reaction",
+        description="Remove a reaction from a message",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "channel_id": {
+                    "type": "string",
+                    "description": "Channel containing the message"
                 },
-                "required": ["channel_id", "message_id", "reason"]
-            }
-        ),
-        Tool(
-            name="list_servers",
-            description="Get a list of all Discord servers the bot has access to with their details such as name, id, member count, and creation date.",
-            inputSchema={
-                "type": "object",
-                "properties": {},
-                "required": []
-            }
-        ),
-        Tool(
-            name="edit_message",
-            description="Edit an existing message in a Discord channel.",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "channel_id": {
-                        "type": "string",
-                        "description": "ID of the channel containing the message"
-                    },
-                    "message_id": {
-                        "type": "string",
-                        "description": "ID of the message to edit"
-                    },
-                    "content": {
-                        "type": "string",
-                        "description": "New content for the message"
-                    }
+                "message_id": {
+                    "type": "string",
+                    "description": "Message to remove reaction from"
                 },
-                "required": ["channel_id", "message_id", "content"]
-            }
-        )
-    ]
-
-@app.call_tool()
-@require_discord_client
-async def call_tool(name: str, arguments: Any) -> List[TextContent]:
-    """Handle Discord tool calls."""
-    
-    if name == "send_message":
-        channel = await discord_client.fetch_channel(int(arguments["channel_id"]))
-        message = await channel.send(arguments["content"])
-        return [TextContent(
-            type="text",
-            text=f"Message sent successfully. Message ID: {message.id}"
-        )]
-
-    elif name == "read_messages":
-        channel = await discord_client.fetch_channel(int(arguments["channel_id"]))
-        limit = min(int(arguments.get("limit", 10)), 100)
-        fetch_users = arguments.get("fetch_reaction_users", False)  # Only fetch users if explicitly requested
-        messages = []
-        async for message in channel.history(limit=limit):
-            reaction_data = []
-            for reaction in message.reactions:
-                emoji_str = str(reaction.emoji.name) if hasattr(reaction.emoji, 'name') and reaction.emoji.name else str(reaction.emoji.id) if hasattr(reaction.emoji, 'id') else str(reaction.emoji)
-                reaction_info = {
-                    "emoji": emoji_str,
-                    "count": reaction.count
+                "emoji": {
+                    "type": "string",
+                    "description": "Emoji to remove (Unicode or custom emoji ID)"
                 }
-                logger.error(f"Emoji: {emoji_str}")
-                reaction_data.append(reaction_info)
-            messages.append({
-                "id": str(message.id),
-                "author": str(message.author),
-                "content": message.content,
-                "timestamp": message.created_at.isoformat(),
-                "reactions": reaction_data  # Add reactions to message dict
-            })
-        # Helper function to format reactions
-        def format_reaction(r):
-            return f"{r['emoji']}({r['count']})"
-            
-        return [TextContent(
-            type="text",
-            text=f"Retrieved {len(messages)} messages:\n\n" + 
-                 "\n".join([
-                     f"{m['author']} ({m['timestamp']}): {m['content']}\n" +
-                     f"Reactions: {', '.join([format_reaction(r) for r in m['reactions']]) if m['reactions'] else 'No reactions'}"
-                     for m in messages
-                 ])
-        )]
-
-    elif name == "get_user_info":
-        user = await discord_client.fetch_user(int(arguments["user_id"]))
-        user_info = {
-            "id": str(user.id),
-            "name": user.name,
-            "discriminator": user.discriminator,
-            "bot": user.bot,
-            "created_at": user.created_at.isoformat()
+            },
+            "required": ["channel_id", "message_id", "emoji"]
         }
-        return [TextContent(
-            type="text",
-            text=f"User information:\n" + 
-                 f"Name: {user_info['name']}#{user_info['discriminator']}\n" +
-                 f"ID: {user_info['id']}\n" +
-                 f"Bot: {user_info['bot']}\n" +
-                 f"Created: {user_info['created_at']}"
-        )]
-
-    elif name == "moderate_message":
-        channel = await discord_client.fetch_channel(int(arguments["channel_id"]))
-        message = await channel.fetch_message(int(arguments["message_id"]))
-        
-        # Delete the message
-        await message.delete(reason=arguments["reason"])
-        
-        # Handle timeout if specified
-        if "timeout_minutes" in arguments and arguments["timeout_minutes"] > 0:
-            if isinstance(message.author, discord.Member):
-                duration = discord.utils.utcnow() + datetime.timedelta(
-                    minutes=arguments["timeout_minutes"]
-                )
-                await message.author.timeout(
+    ),
+    Tool(
+        name="send_message",
+        description="Send a message to a specific channel",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "channel_id": {
+                    "type": "string",
+                    "description": "Discord channel ID"
+                },
+                "content": {
+                    "type": "string",
+                    "description": "Message content"
+                }
+            },
+            "required": ["channel_id", "content"]
+        }
+    ),
+    Tool(
+        name="read_messages",
+        description="Read recent messages from a channel",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "channel_id": {
+                    "type": "string",
+                    "description": "Discord channel ID"
+                },
+                "limit": {
+                    "type": "number",
+                    "description": "Number of messages to fetch (max 100)",
+                    "minimum": 1,
+                    "maximum": 100
+                }
+            },
+            "required": ["channel_id"]
+        }
+    ),
+    Tool(
+        name="get_user_info",
+        description="Get information about a Discord user",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "user_id": {
+                    "type": "string",
+                    "description": "Discord user ID"
+                }
+            },
+            "required": ["user_id"]
+        }
+    ),
+    Tool(
+        name="moderate_message",
+        description="Delete a message and optionally timeout the user",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "channel_id": {
+                    "type": "string",
+                    "description": "Channel ID containing the message"
+                },
+                "message_id": {
+                    "type": "string",
+                    "description": "ID of message to moderate"
+                },
+                "reason": {
+                    "type": "string",
+                    "description": "Reason for moderation"
+                },
+                "timeout_minutes": {
+                    "type": "number",
+                    "description": "Optional timeout duration in minutes",
+                    "minimum": 0,
+                    "maximum": 40320  # Max 4 weeks
+                }
+            },
+            "required": ["channel_id", "message_id", "reason"]
+        }
+    ),
+    Tool(
+        name="list_servers",
+        description="Get a list of all Discord servers the bot has access to with their details such as name, id, member count, and creation date.",
+        inputSchema={
+            "type": "object",
+            "properties": {},
+            "required": []
+        }
+    ),
+    Tool(
+        name="edit_message",
+        description="Edit an existing message in a Discord channel.",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "channel_id": {
+                    "type": "string",
+                    "description": "ID of the channel containing the message"
+                },
+                "message_id": {
+                    "type": "string",
+                    "description": "ID of the message to edit"
+                },
+                "content": {
+                    "type": "string",
+                    "description": "New content for the message"
+                }
+            },
+            "required": ["channel_id", "message_id", "content"]
+        }
+    )
+]
+
+@app.list_tools()
+async def list_tools() -> List[Tool]:
+    """List available Discord tools."""
+    return TOOLS
+
+async def _tool_send_message(arguments: Any) -> List[TextContent]:
+    channel = await _get_channel(arguments["channel_id"])
+    message = await channel.send(arguments["content"])
+    return [TextContent(
+        type="text",
+        text=f"Message sent successfully. Message ID: {message.id}"
+    )]
+
+async def _tool_read_messages(arguments: Any) -> List[TextContent]:
+    channel = await _get_channel(arguments["channel_id"])
+    limit = min(int(arguments.get("limit", 10)), 100)
+    fetch_users = arguments.get("fetch_reaction_users", False)  # Only fetch users if explicitly requested
+    lines = []
+    count = 0
+    async for message in channel.history(limit=limit):
+        count += 1
+        lines.append(f"{message.author} ({message.created_at.isoformat()}): {message.content}")
+        if message.reactions:
+            lines.append("Reactions: " + ", ".join(
+                [f"{_emoji_str(reaction.emoji)}({reaction.count})" for reaction in message.reactions]
+            ))
+        else:
+            lines.append("Reactions: No reactions")
+
+    return [TextContent(
+        type="text",
+        text=f"Retrieved {count} messages:\n\n" + "\n".join(lines)
+    )]
+
+async def _tool_get_user_info(arguments: Any) -> List[TextContent]:
+    user = await _get_user(arguments["user_id"])
+    user_info = {
+        "id": str(user.id),
+        "name": user.name,
+        "discriminator": user.discriminator,
+        "bot": user.bot,
+        "created_at": user.created_at.isoformat()
+    }
+    return [TextContent(
+        type="text",
+        text=f"User information:\n" + 
+             f"Name: {user_info['name']}#{user_info['discriminator']}\n" +
+             f"ID: {user_info['id']}\n" +
+             f"Bot: {user_info['bot']}\n" +
+             f"Created: {user_info['created_at']}"
+    )]
+
+async def _tool_moderate_message(arguments: Any) -> List[TextContent]:
+    channel, message = await _get_message(arguments["channel_id"], arguments["message_id"])
+    
+    # Handle timeout if specified
+    if "timeout_minutes" in arguments and arguments["timeout_minutes"] > 0:
+        if isinstance(message.author, discord.Member):
+            duration = discord.utils.utcnow() + timedelta(
+                minutes=arguments["timeout_minutes"]
+            )
+            # Deleting the message and timing out its author are independent requests
+            await asyncio.gather(
+                message.delete(reason=arguments["reason"]),
+                message.author.timeout(
                     duration,
                     reason=arguments["reason"]
                 )
-                return [TextContent(
-                    type="text",
-                    text=f"Message deleted and user timed out for {arguments['timeout_minutes']} minutes."
-                )]
-        
-        return [TextContent(
-            type="text",
-            text="Message deleted successfully."
-        )]
+            )
+            return [TextContent(
+                type="text",
+                text=f"Message deleted and user timed out for {arguments['timeout_minutes']} minutes."
+            )]
+    
+    # Delete the message
+    await message.delete(reason=arguments["reason"])
+    
+    return [TextContent(
+        type="text",
+        text="Message deleted successfully."
+    )]
 
-    # Server Information Tools
-    elif name == "get_server_info":
-        guild = await discord_client.fetch_guild(int(arguments["server_id"]))
-        info = {
-            "name": guild.name,
-            "id": str(guild.id),
-            "owner_id": str(guild.owner_id),
-            "member_count": guild.member_count,
-            "created_at": guild.created_at.isoformat(),
-            "description": guild.description,
-            "premium_tier": guild.premium_tier,
-            "explicit_content_filter": str(guild.explicit_content_filter)
-        }
-        return [TextContent(
-            type="text",
-            text=f"Server Information:\n" + "\n".join(f"{k}: {v}" for k, v in info.items())
-        )]
+# Server Information Tools
+async def _tool_get_server_info(arguments: Any) -> List[TextContent]:
+    guild = await _get_guild(arguments["server_id"])
+    info = {
+        "name": guild.name,
+        "id": str(guild.id),
+        "owner_id": str(guild.owner_id),
+        "member_count": guild.member_count,
+        "created_at": guild.created_at.isoformat(),
+        "description": guild.description,
+        "premium_tier": guild.premium_tier,
+        "explicit_content_filter": str(guild.explicit_content_filter)
+    }
+    return [TextContent(
+        type="text",
+        text=f"Server Information:\n" + "\n".join(f"{k}: {v}" for k, v in info.items())
+    )]
 
-    elif name == "get_channels":
-        try:
-            guild = discord_client.get_guild(int(arguments["server_id"]))
-            if guild:
-                channel_list = []
-                for channel in guild.channels:
-                    channel_list.append(f"#{channel.name} (ID: {channel.id}) - {channel.type}")
-                
-                return [TextContent(
-                    type="text", 
-                    text=f"Channels in {guild.name}:\n" + "\n".join(channel_list)
-                )]
-            else:
-                return [TextContent(type="text", text="Guild not found")]
-        except Exception as e:
-            return [TextContent(type="text", text=f"Error: {str(e)}")]
+async def _tool_get_channels(arguments: Any) -> List[TextContent]:
+    try:
+        guild = discord_client.get_guild(int(arguments["server_id"]))
+        if guild:
+            channel_list = []
+            for channel in guild.channels:
+                channel_list.append(f"#{channel.name} (ID: {channel.id}) - {channel.type}")
+            
+            return [TextContent(
+                type="text", 
+                text=f"Channels in {guild.name}:\n" + "\n".join(channel_list)
+            )]
+        else:
+            return [TextContent(type="text", text="Guild not found")]
+    except Exception as e:
+        return [TextContent(type="text", text=f"Error: {str(e)}")]
 
-    elif name == "list_members":
-        guild = await discord_client.fetch_guild(int(arguments["server_id"]))
-        limit = min(int(arguments.get("limit", 100)), 1000)
-        
-        members = []
-        async for member in guild.fetch_members(limit=limit):
-            members.append({
-                "id": str(member.id),
-                "name": member.name,
-                "nick": member.nick,
-                "joined_at": member.joined_at.isoformat() if member.joined_at else None,
-                "roles": [str(role.id) for role in member.roles[1:]]  # Skip @everyone
-            })
-        
-        return [TextContent(
-            type="text",
-            text=f"Server Members ({len(members)}):\n" + 
-                 "\n".join(f"{m['name']} (ID: {m['id']}, Roles: {', '.join(m['roles'])})" for m in members)
-        )]
+async def _tool_list_members(arguments: Any) -> List[TextContent]:
+    guild = await _get_guild(arguments["server_id"])
+    limit = min(int(arguments.get("limit", 100)), 1000)
+    
+    lines = []
+    async for member in guild.fetch_members(limit=limit):
+        roles = ', '.join([str(role.id) for role in member.roles[1:]])  # Skip @everyone
+        lines.append(f"{member.name} (ID: {member.id}, Roles: {roles})")
+    
+    return [TextContent(
+        type="text",
+        text=f"Server Members ({len(lines)}):\n" + "\n".join(lines)
+    )]
 
-    # Role Management Tools
-    elif name == "add_role":
-        guild = await discord_client.fetch_guild(int(arguments["server_id"]))
-        member = await guild.fetch_member(int(arguments["user_id"]))
-        role = guild.get_role(int(arguments["role_id"]))
-        
-        await member.add_roles(role, reason="Role added via MCP")
-        return [TextContent(
-            type="text",
-            text=f"Added role {role.name} to user {member.name}"
-        )]
-
-    elif name == "remove_role":
-        guild = await discord_client.fetch_guild(int(arguments["server_id"]))
-        member = await guild.fetch_member(int(arguments["user_id"]))
-        role = guild.get_role(int(arguments["role_id"]))
-        
-        await member.remove_roles(role, reason="Role removed via MCP")
-        return [TextContent(
-            type="text",
-            text=f"Removed role {role.name} from user {member.name}"
-        )]
+# Role Management Tools
+async def _tool_add_role(arguments: Any) -> List[TextContent]:
+    guild = await _get_guild(arguments["server_id"])
+    member = await _get_member(guild, arguments["user_id"])
+    role = guild.get_role(int(arguments["role_id"]))
+    
+    await member.add_roles(role, reason="Role added via MCP")
+    return [TextContent(
+        type="text",
+        text=f"Added role {role.name} to user {member.name}"
+    )]
 
-    # Channel Management Tools
-    elif name == "create_text_channel":
-        guild = await discord_client.fetch_guild(int(arguments["server_id"]))
-        category = None
-        if "category_id" in arguments:
-            category = guild.get_channel(int(arguments["category_id"]))
-        
-        channel = await guild.create_text_channel(
-            name=arguments["name"],
-            category=category,
-            topic=arguments.get("topic"),
-            reason="Channel created via MCP"
-        )
-        
-        return [TextContent(
-            type="text",
-            text=f"Created text channel #{channel.name} (ID: {channel.id})"
-        )]
-
-    elif name == "delete_channel":
-        channel = await discord_client.fetch_channel(int(arguments["channel_id"]))
-        await channel.delete(reason=arguments.get("reason", "Channel deleted via MCP"))
-        return [TextContent(
-            type="text",
-            text=f"Deleted channel successfully"
-        )]
+async def _tool_remove_role(arguments: Any) -> List[TextContent]:
+    guild = await _get_guild(arguments["server_id"])
+    member = await _get_member(guild, arguments["user_id"])
+    role = guild.get_role(int(arguments["role_id"]))
+    
+    await member.remove_roles(role, reason="Role removed via MCP")
+    return [TextContent(
+        type="text",
+        text=f"Removed role {role.name} from user {member.name}"
+    )]
 
-    # Message Reaction Tools
-    elif name == "add_reaction":
-        channel = await discord_client.fetch_channel(int(arguments["channel_id"]))
-        message = await channel.fetch_message(int(arguments["message_id"]))
-        await message.add_reaction(arguments["emoji"])
-        return [TextContent(
-            type="text",
-            text=f"Added reaction {arguments['emoji']} to message"
-        )]
-
-    elif name == "add_multiple_reactions":
-        channel = await discord_client.fetch_channel(int(arguments["channel_id"]))
-        message = await channel.fetch_message(int(arguments["message_id"]))
-        for emoji in arguments["emojis"]:
-            await message.add_reaction(emoji)
-        return [TextContent(
-            type="text",
-            text=f"Added reactions: {', '.join(arguments['emojis'])} to message"
-        )]
-
-    elif name == "remove_reaction":
-        channel = await discord_client.fetch_channel(int(arguments["channel_id"]))
-        message = await channel.fetch_message(int(arguments["message_id"]))
-        await message.remove_reaction(arguments["emoji"], discord_client.user)
-        return [TextContent(
-            type="text",
-            text=f"Removed reaction {arguments['emoji']} from message"
-        )]
-
-    elif name == "list_servers":
-        servers = []
-        for guild in discord_client.guilds:
-            servers.append({
-                "id": str(guild.id),
-                "name": guild.name,
-                "member_count": guild.member_count,
-                "created_at": guild.created_at.isoformat()
-            })
-        
-        return [TextContent(
-            type="text",
-            text=f"Available Servers ({len(servers)}):\n" + 
-                 "\n".join(f"{s['name']} (ID: {s['id']}, Members: {s['member_count']})" for s in servers)
-        )]
-
-    elif name == "edit_message":
-        channel = await discord_client.fetch_channel(int(arguments["channel_id"]))
-        message = await channel.fetch_message(int(arguments["message_id"]))
-        await message.edit(content=arguments["content"])
-        return [TextContent(
-            type="text",
-            text=f"Message {message.id} in channel {channel.id} edited successfully."
-        )]
-
-    raise ValueError(f"Unknown tool: {name}")
+# Channel Management Tools
+async def _tool_create_text_channel(arguments: Any) -> List[TextContent]:
+    guild = await _get_guild(arguments["server_id"])
+    category = None
+    if "category_id" in arguments:
+        category = guild.get_channel(int(arguments["category_id"]))
+    
+    channel = await guild.create_text_channel(
+        name=arguments["name"],
+        category=category,
+        topic=arguments.get("topic"),
+        reason="Channel created via MCP"
+    )
+    
+    return [TextContent(
+        type="text",
+        text=f"Created text channel #{channel.name} (ID: {channel.id})"
+    )]
+
+async def _tool_delete_channel(arguments: Any) -> List[TextContent]:
+    channel = await _get_channel(arguments["channel_id"])
+    await channel.delete(reason=arguments.get("reason", "Channel deleted via MCP"))
+    return [TextContent(
+        type="text",
+        text=f"Deleted channel successfully"
+    )]
+
+# Message Reaction Tools
+async def _tool_add_reaction(arguments: Any) -> List[TextContent]:
+    channel, message = await _get_message(arguments["channel_id"], arguments["message_id"])
+    await message.add_reaction(arguments["emoji"])
+    return [TextContent(
+        type="text",
+        text=f"Added reaction {arguments['emoji']} to message"
+    )]
+
+async def _tool_add_multiple_reactions(arguments: Any) -> List[TextContent]:
+    channel, message = await _get_message(arguments["channel_id"], arguments["message_id"])
+    emojis = arguments["emojis"]
+    results = await asyncio.gather(
+        *(message.add_reaction(emoji) for emoji in emojis),
+        return_exceptions=True
+    )
+    added = [emoji for emoji, result in zip(emojis, results) if not isinstance(result, Exception)]
+    failed = [f"{emoji} ({result})" for emoji, result in zip(emojis, results) if isinstance(result, Exception)]
+    text = f"Added reactions: {', '.join(added)} to message"
+    if failed:
+        text += f"\nFailed to add reactions: {', '.join(failed)}"
+    return [TextContent(
+        type="text",
+        text=text
+    )]
+
+async def _tool_remove_reaction(arguments: Any) -> List[TextContent]:
+    channel, message = await _get_message(arguments["channel_id"], arguments["message_id"])
+    await message.remove_reaction(arguments["emoji"], discord_client.user)
+    return [TextContent(
+        type="text",
+        text=f"Removed reaction {arguments['emoji']} from message"
+    )]
+
+async def _tool_list_servers(arguments: Any) -> List[TextContent]:
+    lines = [
+        f"{guild.name} (ID: {guild.id}, Members: {guild.member_count})"
+        for guild in discord_client.guilds
+    ]
+    
+    return [TextContent(
+        type="text",
+        text=f"Available Servers ({len(lines)}):\n" + "\n".join(lines)
+    )]
+
+async def _tool_edit_message(arguments: Any) -> List[TextContent]:
+    channel, message = await _get_message(arguments["channel_id"], arguments["message_id"])
+    await message.edit(content=arguments["content"])
+    return [TextContent(
+        type="text",
+        text=f"Message {message.id} in channel {channel.id} edited successfully."
+    )]
+
+TOOL_HANDLERS = {
+    "send_message": _tool_send_message,
+    "read_messages": _tool_read_messages,
+    "get_user_info": _tool_get_user_info,
+    "moderate_message": _tool_moderate_message,
+    "get_server_info": _tool_get_server_info,
+    "get_channels": _tool_get_channels,
+    "list_members": _tool_list_members,
+    "add_role": _tool_add_role,
+    "remove_role": _tool_remove_role,
+    "create_text_channel": _tool_create_text_channel,
+    "delete_channel": _tool_delete_channel,
+    "add_reaction": _tool_add_reaction,
+    "add_multiple_reactions": _tool_add_multiple_reactions,
+    "remove_reaction": _tool_remove_reaction,
+    "list_servers": _tool_list_servers,
+    "edit_message": _tool_edit_message
+}
+
+@app.call_tool()
+@require_discord_client
+async def call_tool(name: str, arguments: Any) -> List[TextContent]:
+    """Handle Discord tool calls."""
+    handler = TOOL_HANDLERS.get(name)
+    if handler is None:
+        raise ValueError(f"Unknown tool: {name}")
+    return await handler(arguments)
 
 # New command for image analysis
 @bot.command(name="look")
@@ -780,63 +864,77 @@ async def look(ctx):
     # Send initial thinking message
     thinking_message = await ctx.send("🧐 Looking...")
 
+    # Download every image first so the analyses can be pipelined
+    image_filenames = []
+    image_ids = []
     try:
-        for attachment in ctx.message.attachments:
-            if "image" in attachment.content_type:
-                # Create a unique filename for the downloaded image
-                image_filename = os.path.join(TEMP_IMAGE_DIR, f"{uuid.uuid4()}_{attachment.filename}")
-                
-                # Download the image
-                async with aiohttp.ClientSession() as session:
+        async with aiohttp.ClientSession() as session:
+            for attachment in ctx.message.attachments:
+                if "image" in attachment.content_type:
+                    # Create a unique filename for the downloaded image
+                    image_id = uuid.uuid4()
+                    image_filename = os.path.join(TEMP_IMAGE_DIR, f"{image_id}_{attachment.filename}")
+                    
+                    # Download the image
                     async with session.get(attachment.url) as resp:
                         if resp.status == 200:
                             with open(image_filename, "wb") as f:
                                 f.write(await resp.read())
                             logger.info(f"Downloaded image: {image_filename}")
-
-                            # Perform analysis using our new module
-                            analysis_result, ocr_text = analyse_image(image_filename)
-
-                            # Create timestamp for consistent filenames
-                            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                            
-                            # Save the full analysis to a markdown file
-                            analysis_log_filename = os.path.join(ANALYSIS_LOG_DIR, f"analysis_{timestamp}.md")
-                            with open(analysis_log_filename, "w", encoding="utf-8") as f:
-                                f.write(analysis_result)
-                            logger.info(f"Full analysis saved to {analysis_log_filename}")
-
-                            # Save the raw OCR text to a text file
-                            ocr_log_filename = os.path.join(OCR_LOG_DIR, f"ocr_{timestamp}.txt")
-                            with open(ocr_log_filename, "w", encoding="utf-8") as f:
-                                f.write(ocr_text)
-                            logger.info(f"Raw OCR text saved to {ocr_log_filename}")
-
-                            # Truncate for Discord and add a note about the full log
-                            max_length = 1700 # Leave plenty of room for the header and footer
-                            truncated_analysis = analysis_result
-                            if len(truncated_analysis) > max_length:
-                                truncated_analysis = truncated_analysis[:max_length] + "\n... [ANALYSIS TRUNCATED]"
-                            
-                            final_content = (
-                                f"**Screenshot Analysis:**\n{truncated_analysis}\n\n"
-                                f"*Full analysis saved to `{analysis_log_filename}`*\n"
-                                f"*Raw OCR text saved to `{ocr_log_filename}`*"
-                            )
-
-                            # Edit the thinking message with the analysis result
-                            await thinking_message.edit(content=final_content)
-                            
-                            # Clean up the downloaded image
-                            os.remove(image_filename)
-                            logger.info(f"Cleaned up image: {image_filename}")
+                            image_filenames.append(image_filename)
+                            image_ids.append(image_id)
                         else:
                             await thinking_message.edit(content=f"Failed to download image: {resp.status}")
-            else:
-                await thinking_message.edit(content="Attached file is not an image.")
+                else:
+                    await thinking_message.edit(content="Attached file is not an image.")
+
+        # Perform analysis using our new module
+        index = 0
+        async for analysis_result, ocr_text in analyse_images(image_filenames):
+            image_id = image_ids[index]
+            index += 1
+
+            # Create timestamp for consistent filenames. Several images can finish within
+            # the same second, so the image's id keeps their logs apart.
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            
+            # Save the full analysis to a markdown file
+            analysis_log_filename = os.path.join(ANALYSIS_LOG_DIR, f"analysis_{timestamp}_{image_id}.md")
+            with open(analysis_log_filename, "w", encoding="utf-8") as f:
+                f.write(analysis_result)
+            logger.info(f"Full analysis saved to {analysis_log_filename}")
+
+            # Save the raw OCR text to a text file
+            ocr_log_filename = os.path.join(OCR_LOG_DIR, f"ocr_{timestamp}_{image_id}.txt")
+            with open(ocr_log_filename, "w", encoding="utf-8") as f:
+                f.write(ocr_text)
+            logger.info(f"Raw OCR text saved to {ocr_log_filename}")
+
+            # Truncate for Discord and add a note about the full log
+            max_length = 1700 # Leave plenty of room for the header and footer
+            truncated_analysis = analysis_result
+            if len(truncated_analysis) > max_length:
+                truncated_analysis = truncated_analysis[:max_length] + "\n... [ANALYSIS TRUNCATED]"
+            
+            final_content = (
+                f"**Screenshot Analysis:**\n{truncated_analysis}\n\n"
+                f"*Full analysis saved to `{analysis_log_filename}`*\n"
+                f"*Raw OCR text saved to `{ocr_log_filename}`*"
+            )
+
+            # Edit the thinking message with the analysis result
+            await thinking_message.edit(content=final_content)
     except Exception as e:
         logger.error(f"Error during !look_command: {e}")
         await thinking_message.edit(content=f"An error occurred during analysis: {e}")
+    finally:
+        # Clean up the downloaded images, including any not analysed because of an error
+        for image_filename in image_filenames:
+            try:
+                os.remove(image_filename)
+                logger.info(f"Cleaned up image: {image_filename}")
+            except OSError as e:
+                logger.warning(f"Failed to clean up image {image_filename}: {e}")
 
 async def main():
     global TARGET_CHANNEL_IDS
@@ -851,8 +949,9 @@ async def main():
     if not channel_ids_str:
         raise ValueError(f"Environment variable '{args.channel_var}' for target channel ID(s) is required.")
     
-    TARGET_CHANNEL_IDS = [id.strip() for id in channel_ids_str.split(',')]
-    if not TARGET_CHANNEL_IDS or not all(TARGET_CHANNEL_IDS):
+    try:
+        TARGET_CHANNEL_IDS = frozenset(int(id.strip()) for id in channel_ids_str.split(','))
+    except ValueError:
         raise ValueError(f"Environment variable '{args.channel_var}' must contain at least one valid channel ID.")
 
     # Start WebSocket server in the background
@@ -870,21 +969,75 @@ async def main():
         )
 
 # --- WebSocket Logic ---
+async def ws_writer(websocket, outbox, unsent):
+    """
+    Drains a connection's outbox, coalescing queued payloads into as few frames as possible.
+    Entries taken from the outbox but not sent when the writer stops are added to unsent.
+    """
+    batch = []
+    try:
+        while True:
+            batch = [await outbox.get()]
+            # Give closely spaced messages a moment to arrive so they share a frame
+            await asyncio.sleep(WS_BATCH_DELAY)
+            while len(batch) < WS_BATCH_SIZE and not outbox.empty():
+                batch.append(outbox.get_nowait())
+
+            if len(batch) == 1:
+                await websocket.send(json_dumps(batch[0][0]))
+            else:
+                await websocket.send(json_dumps({"type": "batch", "items": [payload for payload, _ in batch]}))
+            batch = []
+    except websockets.exceptions.ConnectionClosed:
+        pass
+    finally:
+        unsent.extend(batch)
+
+async def fail_forward(thinking_message):
+    """Replaces the "Thinking..." placeholder of a message that could not be forwarded."""
+    try:
+        await thinking_message.edit(
+            content="An error occurred while processing your message: the WebSocket connection closed before it was forwarded."
+        )
+    except Exception as e:
+        logger.error(f"Failed to edit thinking message after error: {e}", exc_info=True)
+
 async def websocket_handler(websocket):
+    # Each connection has its own outbox and writer, so nothing queued for one
+    # connection is ever sent to another
+    outbox = asyncio.Queue(maxsize=WS_OUTBOX_MAXSIZE)
+    unsent = []
+    writer_task = None
     state.websocket_client = websocket
+    state.ws_outbox = outbox
     logger.info("Extension connected via WebSocket.")
-    await websocket.send(json.dumps({"type": "connection", "isActive": True}))
-    
+
     try:
+        await websocket.send(json_dumps({"type": "connection", "isActive": True}))
+        writer_task = asyncio.create_task(ws_writer(websocket, outbox, unsent))
         await websocket.wait_closed()
     except websockets.exceptions.ConnectionClosed:
         logger.warning("Extension disconnected.")
     finally:
-        state.websocket_client = None
+        # A reconnect may already have replaced this connection
+        if state.websocket_client is websocket:
+            state.websocket_client = None
+            state.ws_outbox = None
+        if writer_task is not None:
+            writer_task.cancel()
+            await asyncio.gather(writer_task, return_exceptions=True)
+
+        while not outbox.empty():
+            unsent.append(outbox.get_nowait())
+        if unsent:
+            logger.warning(f"Dropped {len(unsent)} queued message(s): WebSocket closed.")
+            await asyncio.gather(*(fail_forward(thinking_message) for _, thinking_message in unsent))
 
 async def start_websocket_server(port):
     logger.info(f"Starting WebSocket server on localhost:{port}...")
-    state.websocket_server = await websockets.serve(websocket_handler, "localhost", port)
+    # Payloads are small JSON messages to a single local client, so per-message deflate
+    # costs more CPU than it saves in bytes.
+    state.websocket_server = await websockets.serve(websocket_handler, "localhost", port, compression=None)
     try:
         await state.websocket_server.wait_closed()
     except asyncio.CancelledError:
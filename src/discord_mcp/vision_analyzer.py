@@ -1,10 +1,262 @@
 import os
+import asyncio
+import concurrent.futures
+import hashlib
+import logging
+import mimetypes
+import mmap
+import multiprocessing
+import threading
+import time
+from collections import OrderedDict
+from google.api_core import exceptions as google_exceptions
+from google.api_core.retry import Retry, if_exception_type
+from google.api_core.retry_async import AsyncRetry
 from google.cloud import vision
 import google.generativeai as genai
 
+logger = logging.getLogger(__name__)
+
 # --- Configuration ---
 _is_configured = False
 
+GEMINI_MODEL = 'gemini-2.5-flash'
+# The analysis length the prompt asks for; streamed analyses are also cut off here
+MAX_ANALYSIS_CHARS = 1000
+
+# The analysis prompt wraps the OCR text; it combines the visual information from
+# the image with the clean text from the OCR.
+_PROMPT_PREFIX = (
+    "Analyse the following image. Here is the text extracted from it, which you can "
+    "trust as accurate. Based on both the image and the text, provide a helpful "
+    "analysis. Think about - What can you see? What might the user be trying to achieve? What are they doing right now? What advice can you offer to help? "
+    "Be insightful and proactive.\n\n"
+    f"IMPORTANT: Your entire analysis must be detailed but concise, and strictly under {MAX_ANALYSIS_CHARS} characters. "
+    "Focus on the most valuable takeaways and use the available space to its full potential.\n\n"
+    "--- OCR TEXT ---\n"
+)
+_PROMPT_SUFFIX = "\n--- END OCR TEXT ---"
+_TRUNC_SUFFIX = "\n... [TRUNCATED]"
+
+# OCR text longer than MAX_OCR_CHARS is cut at the last word break within the
+# final OCR_TRUNCATION_WINDOW characters before the limit
+MAX_OCR_CHARS = 3500
+OCR_TRUNCATION_WINDOW = 200
+
+# Images larger than this on either side are downscaled before being sent to the APIs
+MAX_IMAGE_DIMENSION = 2048
+DOWNSCALED_JPEG_QUALITY = 85
+
+OCR_FEATURE = vision.Feature.Type.DOCUMENT_TEXT_DETECTION
+
+def _fingerprint(*parts) -> str:
+    return hashlib.blake2b("\0".join(map(str, parts)).encode("utf-8"), digest_size=8).hexdigest()
+
+# Cached results are keyed on a hash of everything that shapes the request, so a change
+# to the OCR feature, image preparation, model, prompt or truncation rule never reuses
+# stale results
+_OCR_FINGERPRINT = _fingerprint(OCR_FEATURE.name, MAX_IMAGE_DIMENSION, DOWNSCALED_JPEG_QUALITY)
+_ANALYSIS_FINGERPRINT = _fingerprint(
+    _OCR_FINGERPRINT, GEMINI_MODEL, _PROMPT_PREFIX, _PROMPT_SUFFIX, _TRUNC_SUFFIX,
+    MAX_OCR_CHARS, OCR_TRUNCATION_WINDOW, MAX_ANALYSIS_CHARS
+)
+
+# Images below this size are sent inline with the request instead of through the File API
+INLINE_IMAGE_LIMIT = 18 * 1024 * 1024  # bytes
+
+# API clients are created once and reused so their connections and auth are not rebuilt per call
+_vision_client = None
+_gemini_model = None
+_client_lock = threading.Lock()
+
+# Image downscaling is CPU-bound, so it runs in worker processes rather than threads.
+# The pipeline has at most a couple of images in preprocessing at once.
+PREPROCESS_WORKERS = min(2, os.cpu_count() or 1)
+_preprocess_pool = None
+
+# Quota and availability errors are retried with jittered exponential backoff
+_RETRY_SETTINGS = dict(
+    predicate=if_exception_type(
+        google_exceptions.ResourceExhausted,
+        google_exceptions.ServiceUnavailable,
+        google_exceptions.DeadlineExceeded
+    ),
+    initial=1.0,
+    maximum=32.0,
+    multiplier=2.0,
+    timeout=120.0
+)
+_retry = Retry(**_RETRY_SETTINGS)
+_async_retry = AsyncRetry(**_RETRY_SETTINGS)
+
+class RateLimiter:
+    """
+    Async context manager that caps the number of in-flight API calls and spaces
+    call starts at least 1/rps seconds apart (a token bucket with a burst of one).
+    """
+
+    def __init__(self, max_inflight: int, rps: float):
+        self._semaphore = asyncio.Semaphore(max_inflight)
+        self._interval = 1.0 / rps if rps > 0 else 0.0
+        self._next_slot = 0.0
+
+    async def __aenter__(self):
+        await self._semaphore.acquire()
+        try:
+            if self._interval:
+                now = asyncio.get_running_loop().time()
+                slot = max(self._next_slot, now)
+                self._next_slot = slot + self._interval
+                if slot > now:
+                    await asyncio.sleep(slot - now)
+        except BaseException:
+            self._semaphore.release()
+            raise
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self._semaphore.release()
+
+_ocr_limiter = RateLimiter(int(os.getenv("OCR_CONCURRENCY", "8")), float(os.getenv("OCR_RPS", "10")))
+_gemini_limiter = RateLimiter(int(os.getenv("GEMINI_CONCURRENCY", "4")), float(os.getenv("GEMINI_RPS", "5")))
+
+# Concurrent OCR requests are coalesced into one batch_annotate_images call
+OCR_BATCH_SIZE = 16  # Vision API limit on images per batch request
+OCR_BATCH_WAIT = 0.05  # seconds to wait for more images after the first arrives
+# Only the full text (and any error) is read from each response, so the rest is masked out
+_OCR_FIELD_MASK = (("x-goog-fieldmask", "responses.full_text_annotation.text,responses.error"),)
+
+# --- Result Cache ---
+# OCR text and Gemini analyses are cached by image content hash, on disk and in a small
+# in-process LRU layer in front of it.
+CACHE_DIR = os.getenv("VISION_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "discord_mcp"))
+CACHE_MAX_AGE = float(os.getenv("VISION_CACHE_MAX_AGE", 30 * 24 * 3600))  # seconds
+MEMORY_CACHE_SIZE = 256
+CACHE_PRUNE_INTERVAL = 24 * 3600  # seconds between sweeps for expired entries
+
+_memory_cache = OrderedDict()  # {(kind, key): text}
+_last_prune = 0.0
+
+# Work in flight for an image, keyed like the memory cache, shared by concurrent requests
+_inflight = {}  # {(stage, key): asyncio.Task}
+
+def _hash_file(image_path: str) -> str:
+    """Returns the BLAKE2b hex digest of a file, hashed in one call over a memory map of it."""
+    with open(image_path, "rb") as image_file:
+        if os.fstat(image_file.fileno()).st_size == 0:
+            return hashlib.blake2b(digest_size=16).hexdigest()
+        with mmap.mmap(image_file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            return hashlib.blake2b(mapped, digest_size=16).hexdigest()
+
+def _read_bytes(image_path: str) -> bytes:
+    with open(image_path, "rb") as image_file:
+        return image_file.read()
+
+def _needs_downscale(image_path: str) -> bool:
+    """Returns whether the image is larger than MAX_IMAGE_DIMENSION, reading only its header."""
+    from PIL import Image
+
+    try:
+        with Image.open(image_path) as image:
+            return max(image.size) > MAX_IMAGE_DIMENSION
+    except OSError:
+        return False
+
+def _prepare_image(image_path: str) -> str:
+    """
+    Returns the path of the image to send to the APIs: the original if it is small enough,
+    otherwise a downscaled JPEG copy written next to it, which the caller must remove.
+    """
+    from PIL import Image, ImageOps
+
+    try:
+        image = Image.open(image_path)
+    except OSError:
+        # Formats Pillow cannot read (e.g. HEIC) are sent to the APIs as they are
+        return image_path
+
+    with image:
+        if max(image.size) <= MAX_IMAGE_DIMENSION:
+            return image_path
+
+        # The EXIF orientation is lost on re-encoding, so rotate the pixels to match it
+        image = ImageOps.exif_transpose(image)
+
+        # Convert before resizing, since palette images would be resized with NEAREST
+        if image.mode == "P":
+            image = image.convert("RGBA" if "transparency" in image.info else "RGB")
+        if image.mode in ("RGBA", "LA", "PA"):
+            # JPEG has no alpha; flatten onto white so dark text on a transparent
+            # background stays readable
+            rgba = image.convert("RGBA")
+            image = Image.new("RGB", rgba.size, "white")
+            image.paste(rgba, mask=rgba)
+        elif image.mode not in ("RGB", "L"):
+            image = image.convert("RGB")
+
+        image.thumbnail((MAX_IMAGE_DIMENSION, MAX_IMAGE_DIMENSION), Image.LANCZOS)
+        prepared_path = f"{os.path.splitext(image_path)[0]}_downscaled.jpg"
+        image.save(prepared_path, format="JPEG", quality=DOWNSCALED_JPEG_QUALITY, optimize=True)
+    return prepared_path
+
+def _cache_path(kind: str, key: str) -> str:
+    return os.path.join(CACHE_DIR, kind, f"{key}.txt")
+
+def _cache_get(kind: str, key: str):
+    """Returns the cached text for (kind, key), or None on a miss or expired entry."""
+    text = _memory_cache.get((kind, key))
+    if text is not None:
+        _memory_cache.move_to_end((kind, key))
+        return text
+
+    path = _cache_path(kind, key)
+    try:
+        if time.time() - os.path.getmtime(path) > CACHE_MAX_AGE:
+            # Remove stale entries as they are found so the cache directory doesn't grow forever
+            os.remove(path)
+            return None
+        with open(path, "r", encoding="utf-8") as f:
+            text = f.read()
+    except OSError:
+        return None
+
+    _remember(kind, key, text)
+    return text
+
+def _cache_put(kind: str, key: str, text: str):
+    """Stores text for (kind, key), replacing the file atomically so readers never see partial writes."""
+    path = _cache_path(kind, key)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+    _remember(kind, key, text)
+
+    # Entries that are never read again are only removed by a periodic sweep
+    global _last_prune
+    if time.time() - _last_prune > CACHE_PRUNE_INTERVAL:
+        _last_prune = time.time()
+        threading.Thread(target=_prune_cache, daemon=True).start()
+
+def _prune_cache():
+    """Deletes expired entries from the disk cache."""
+    cutoff = time.time() - CACHE_MAX_AGE
+    for root, _, files in os.walk(CACHE_DIR):
+        for name in files:
+            path = os.path.join(root, name)
+            try:
+                if os.path.getmtime(path) < cutoff:
+                    os.remove(path)
+            except OSError:
+                pass
+
+def _remember(kind: str, key: str, text: str):
+    _memory_cache[(kind, key)] = text
+    _memory_cache.move_to_end((kind, key))
+    if len(_memory_cache) > MEMORY_CACHE_SIZE:
+        _memory_cache.popitem(last=False)
+
 def _ensure_configured():
     """
     Ensures that the necessary API keys are configured before use.
@@ -22,31 +274,133 @@ def _ensure_configured():
 
     # Check for Vision API credentials
     if not os.getenv("GOOGLE_APPLICATION_CREDENTIALS"):
-        print("Warning: GOOGLE_APPLICATION_CREDENTIALS environment variable is not set. OCR may fail.")
+        logger.warning("GOOGLE_APPLICATION_CREDENTIALS environment variable is not set. OCR may fail.")
     
     _is_configured = True
 
-def get_ocr_text(image_path: str) -> str:
+def _get_vision_client():
+    """Returns the shared Vision client, creating it on first use."""
+    global _vision_client
+    if _vision_client is None:
+        with _client_lock:
+            if _vision_client is None:
+                _vision_client = vision.ImageAnnotatorAsyncClient()
+    return _vision_client
+
+def _get_gemini_model():
+    """Returns the shared Gemini model, creating it on first use."""
+    global _gemini_model
+    if _gemini_model is None:
+        with _client_lock:
+            if _gemini_model is None:
+                _gemini_model = genai.GenerativeModel(GEMINI_MODEL)
+    return _gemini_model
+
+def _get_preprocess_pool():
+    """Returns the shared process pool for image preprocessing, creating it on first use."""
+    global _preprocess_pool
+    if _preprocess_pool is None:
+        with _client_lock:
+            if _preprocess_pool is None:
+                # Workers are started from a clean process; forking this one could copy
+                # locks held by its threads and the gRPC client into the child
+                start_method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+                _preprocess_pool = concurrent.futures.ProcessPoolExecutor(
+                    max_workers=PREPROCESS_WORKERS,
+                    mp_context=multiprocessing.get_context(start_method)
+                )
+    return _preprocess_pool
+
+class AsyncOcrBatcher:
+    """
+    Collects OCR requests made within a short window and sends them to the Vision API
+    as a single batch, fanning each response back out to its caller.
+    """
+
+    def __init__(self, max_batch: int = OCR_BATCH_SIZE, max_wait: float = OCR_BATCH_WAIT):
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self._queue = None
+        self._process_task = None
+        self._batch_tasks = set()
+
+    async def submit(self, content: bytes):
+        """Queues image bytes for text detection and returns that image's AnnotateImageResponse."""
+        if self._process_task is None or self._process_task.done():
+            self._queue = asyncio.Queue()
+            self._process_task = asyncio.create_task(self._process_loop())
+
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((content, future))
+        return await future
+
+    async def _process_loop(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.max_batch:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+
+            # Send the batch in the background so the next one can start collecting
+            task = asyncio.create_task(self._annotate(batch))
+            self._batch_tasks.add(task)
+            task.add_done_callback(self._batch_tasks.discard)
+
+    async def _annotate(self, batch):
+        requests = [
+            {"image": vision.Image(content=content), "features": [{"type_": OCR_FEATURE}]}
+            for content, _ in batch
+        ]
+        try:
+            async with _ocr_limiter:
+                # Passed as retry= so it replaces the method's default policy rather than
+                # wrapping it, which would retry each of our attempts for up to 600s
+                result = await _get_vision_client().batch_annotate_images(
+                    requests=requests, retry=_async_retry, metadata=_OCR_FIELD_MASK
+                )
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future), response in zip(batch, result.responses):
+            if not future.done():
+                future.set_result(response)
+
+_ocr_batcher = AsyncOcrBatcher()
+
+async def get_ocr_text(image_path: str, image_hash: str = None, content: bytes = None) -> str:
     """
     Uses Google Cloud Vision API to extract text from an image.
 
     Args:
         image_path: The path to the local image file.
+        image_hash: Optional content hash of the image, used to cache the result.
+        content: Optional bytes of the image, if the caller has already read it.
 
     Returns:
         The extracted text as a single string.
     """
-    _ensure_configured()
-    print(f"Performing OCR on {image_path}...")
-    client = vision.ImageAnnotatorClient()
+    ocr_key = f"{image_hash}_{_OCR_FINGERPRINT}" if image_hash else None
+    if ocr_key:
+        cached = _cache_get("ocr", ocr_key)
+        if cached is not None:
+            return cached
 
-    with open(image_path, "rb") as image_file:
-        content = image_file.read()
+    _ensure_configured()
+    logger.debug("Performing OCR on %s...", image_path)
+    if content is None:
+        content = await asyncio.to_thread(_read_bytes, image_path)
 
-    image = vision.Image(content=content)
-    
-    response = client.text_detection(image=image)
-    texts = response.text_annotations
+    response = await _ocr_batcher.submit(content)
 
     if response.error.message:
         raise Exception(
@@ -54,51 +408,189 @@ def get_ocr_text(image_path: str) -> str:
             "https://cloud.google.com/apis/design/errors"
         )
 
-    if texts:
-        return texts[0].description
-    else:
-        return ""
+    ocr_text = response.full_text_annotation.text
+    if ocr_key:
+        _cache_put("ocr", ocr_key, ocr_text)
+    return ocr_text
 
-def analyze_image_with_gemini(image_path: str, ocr_text: str) -> str:
+async def prepare_image_for_gemini(image_path: str, content: bytes = None):
     """
-    Analyzes an image and its OCR text using the Gemini model.
+    Prepares an image to pass to the Gemini model. Images under INLINE_IMAGE_LIMIT are
+    sent inline with the request, saving the File API round trip; larger ones are uploaded.
 
     Args:
         image_path: The path to the local image file.
-        ocr_text: The text extracted from the image by the Vision API.
+        content: Optional bytes of the image, if the caller has already read it.
 
     Returns:
-        The analysis from the Gemini model.
+        An inline image part, or the uploaded file handle.
     """
     _ensure_configured()
-    print("Analyzing image with Gemini...")
-    model = genai.GenerativeModel('gemini-2.5-flash')
-    
-    # Truncate OCR text to avoid exceeding the API limit
-    max_ocr_length = 3500
-    if len(ocr_text) > max_ocr_length:
-        ocr_text = ocr_text[:max_ocr_length] + "\n... [TRUNCATED]"
-
-    # The prompt will combine the visual information from the image
-    # with the clean text from the OCR.
-    prompt = (
-        "Analyse the following image. Here is the text extracted from it, which you can "
-        "trust as accurate. Based on both the image and the text, provide a helpful "
-        "analysis. Think about - What can you see? What might the user be trying to achieve? What are they doing right now? What advice can you offer to help? "
-        "Be insightful and proactive.\n\n"
-        "IMPORTANT: Your entire analysis must be detailed but concise, and strictly under 1000 characters. "
-        "Focus on the most valuable takeaways and use the available space to its full potential.\n\n"
-        f"--- OCR TEXT ---\n{ocr_text}\n--- END OCR TEXT ---"
-    )
+    size = len(content) if content is not None else os.path.getsize(image_path)
+    if size < INLINE_IMAGE_LIMIT:
+        if content is None:
+            content = await asyncio.to_thread(_read_bytes, image_path)
+        mime_type = mimetypes.guess_type(image_path)[0] or "image/jpeg"
+        return {"mime_type": mime_type, "data": content}
+
+    async with _gemini_limiter:
+        return await asyncio.to_thread(_retry(genai.upload_file), image_path)
+
+async def stream_analysis_with_gemini(image_for_gemini, ocr_text: str, max_chars: int = MAX_ANALYSIS_CHARS):
+    """
+    Analyzes an image and its OCR text using the Gemini model, streaming the response.
+
+    Args:
+        image_for_gemini: The image as returned by prepare_image_for_gemini.
+        ocr_text: The text extracted from the image by the Vision API.
+        max_chars: The response is abandoned once the analysis reaches this length.
+
+    Yields:
+        The analysis so far, growing with each streamed chunk.
+    """
+    _ensure_configured()
+    logger.debug("Analyzing image with Gemini...")
+    model = _get_gemini_model()
     
-    # Generate content using the Gemini model
-    image_for_gemini = genai.upload_file(image_path)
-    response = model.generate_content([prompt, image_for_gemini])
+    # Truncate OCR text to avoid exceeding the API limit, at a word break so no word is cut in half
+    if len(ocr_text) > MAX_OCR_CHARS:
+        window_start = MAX_OCR_CHARS - OCR_TRUNCATION_WINDOW
+        cut = max(ocr_text.rfind(" ", window_start, MAX_OCR_CHARS), ocr_text.rfind("\n", window_start, MAX_OCR_CHARS))
+        if cut == -1:
+            cut = MAX_OCR_CHARS
+        ocr_text = ocr_text[:cut] + _TRUNC_SUFFIX
+
+    prompt = _PROMPT_PREFIX + ocr_text + _PROMPT_SUFFIX
     
-    return response.text
+    # Generate content using the Gemini model. The limiter is held until the stream has
+    # been read or abandoned, since the generation runs for as long as it is open.
+    async with _gemini_limiter:
+        response = await _async_retry(model.generate_content_async)([prompt, image_for_gemini], stream=True)
+        chunks = aiter(response)
+        try:
+            analysis = ""
+            async for chunk in chunks:
+                analysis += chunk.text
+                if len(analysis) >= max_chars:
+                    # Stop reading the stream; the rest would be cut off anyway
+                    yield analysis[:max_chars]
+                    return
+                yield analysis
+        finally:
+            await chunks.aclose()
 
+async def analyze_image_with_gemini(image_for_gemini, ocr_text: str) -> str:
+    """
+    Analyzes an image and its OCR text using the Gemini model.
 
-def analyse_image(image_path: str) -> (str, str):
+    Args:
+        image_for_gemini: The image as returned by prepare_image_for_gemini.
+        ocr_text: The text extracted from the image by the Vision API.
+
+    Returns:
+        The analysis from the Gemini model.
+    """
+    analysis = ""
+    async for analysis in stream_analysis_with_gemini(image_for_gemini, ocr_text):
+        pass
+    return analysis
+
+
+def _shared(key, coro_function, *args):
+    """
+    Returns an awaitable for the in-flight task under key, starting coro_function(*args)
+    if there is none, so concurrent requests for the same image share one set of API calls.
+    The task is shielded so one caller giving up does not cancel it for the others.
+    """
+    task = _inflight.get(key)
+    if task is None:
+        task = asyncio.create_task(coro_function(*args))
+        _inflight[key] = task
+        task.add_done_callback(lambda _: _inflight.pop(key, None))
+    return asyncio.shield(task)
+
+async def _prefetch_image(image_path: str):
+    """
+    Runs the stages of the workflow that only depend on the image: hashing, OCR and
+    the Gemini upload. Anything already cached is skipped.
+
+    Returns:
+        A tuple of (analysis_key, cached analysis or None, OCR text, uploaded image or None).
+    """
+    image_hash = await asyncio.to_thread(_hash_file, image_path)
+    analysis_key = f"{image_hash}_{_ANALYSIS_FINGERPRINT}"
+    analysis = _cache_get("gemini", analysis_key)
+    if analysis is not None:
+        return analysis_key, analysis, await get_ocr_text(image_path, image_hash), None
+
+    ocr_text, image_for_gemini = await _shared(("prefetch", image_hash), _prepare_and_extract, image_path, image_hash)
+    return analysis_key, None, ocr_text, image_for_gemini
+
+async def _prepare_and_extract(image_path: str, image_hash: str):
+    """Downscales the image if needed, then runs OCR on it while preparing it for Gemini."""
+    # Most images are already small enough, so the process pool is only used for those that aren't
+    prepared_path = image_path
+    if await asyncio.to_thread(_needs_downscale, image_path):
+        loop = asyncio.get_running_loop()
+        prepared_path = await loop.run_in_executor(_get_preprocess_pool(), _prepare_image, image_path)
+    try:
+        # The image is read once and its bytes handed to both the OCR and the Gemini request
+        content = await asyncio.to_thread(_read_bytes, prepared_path)
+        # Step 1: Extract text using Google Cloud Vision OCR while preparing the image for Gemini
+        return await asyncio.gather(
+            get_ocr_text(prepared_path, image_hash, content),
+            prepare_image_for_gemini(prepared_path, content)
+        )
+    finally:
+        if prepared_path != image_path:
+            os.remove(prepared_path)
+
+async def _analyse_and_cache(analysis_key: str, image_for_gemini, ocr_text: str) -> str:
+    analysis = await analyze_image_with_gemini(image_for_gemini, ocr_text)
+    _cache_put("gemini", analysis_key, analysis)
+    return analysis
+
+async def _stream_analysis(prefetch, stream: bool = True):
+    """
+    Awaits a prefetch from _prefetch_image and finishes the analysis with Gemini,
+    streaming partial analyses unless stream is False.
+    """
+    try:
+        analysis_key, analysis, ocr_text, image_for_gemini = await prefetch
+        if analysis is not None:
+            yield analysis, ocr_text
+            return
+
+        # Step 2: Analyse the image and text with Gemini, joining an identical analysis
+        # already in flight rather than starting another
+        gemini_key = ("gemini", analysis_key)
+        if not stream or gemini_key in _inflight:
+            yield await _shared(gemini_key, _analyse_and_cache, analysis_key, image_for_gemini, ocr_text), ocr_text
+            return
+
+        analysis = ""
+        partials = stream_analysis_with_gemini(image_for_gemini, ocr_text)
+        try:
+            async for analysis in partials:
+                yield analysis, ocr_text
+        finally:
+            # Closed explicitly so a consumer stopping early releases the Gemini slot now
+            await partials.aclose()
+        _cache_put("gemini", analysis_key, analysis)
+
+    except Exception as e:
+        error_message = f"Sorry, I encountered an error while trying to analyse the image: {e}"
+        logger.error("An error occurred during image analysis: %s", e)
+        yield error_message, ""
+
+async def _complete_analysis(prefetch) -> (str, str):
+    """Awaits a prefetch from _prefetch_image and finishes the analysis with Gemini."""
+    result = ("", "")
+    async for result in _stream_analysis(prefetch, stream=False):
+        pass
+    return result
+
+async def analyse_image(image_path: str) -> (str, str):
     """
     The main function to orchestrate the full image analysis workflow.
 
@@ -110,19 +602,53 @@ def analyse_image(image_path: str) -> (str, str):
         - The final analysis string.
         - The raw OCR text string.
     """
+    return await _complete_analysis(_prefetch_image(image_path))
+
+async def analyse_image_stream(image_path: str):
+    """
+    Runs the same workflow as analyse_image, yielding the analysis as Gemini streams it.
+
+    Args:
+        image_path: The path to the local image file.
+
+    Yields:
+        A (partial analysis, ocr_text) tuple per streamed chunk; the last one is final.
+        Consumers that stop early should aclose() the generator so the response stream
+        is closed and its Gemini concurrency slot released straight away.
+    """
+    results = _stream_analysis(_prefetch_image(image_path))
     try:
-        # Step 1: Extract text using Google Cloud Vision OCR
-        ocr_text = get_ocr_text(image_path)
+        async for result in results:
+            yield result
+    finally:
+        await results.aclose()
 
-        # Step 2: Analyse the image and text with Gemini
-        analysis = analyze_image_with_gemini(image_path, ocr_text)
-        
-        return analysis, ocr_text
+async def analyse_images(image_paths: list):
+    """
+    Analyses several images in order, starting the OCR and upload for the next image
+    while Gemini is still working on the current one.
 
-    except Exception as e:
-        error_message = f"Sorry, I encountered an error while trying to analyse the image: {e}"
-        print(f"An error occurred during image analysis: {e}")
-        return error_message, ""
+    Args:
+        image_paths: The paths to the local image files.
+
+    Yields:
+        A (analysis, ocr_text) tuple for each image, in the order given.
+    """
+    if not image_paths:
+        return
+
+    next_prefetch = asyncio.create_task(_prefetch_image(image_paths[0]))
+    try:
+        for index in range(len(image_paths)):
+            current = next_prefetch
+            next_prefetch = None
+            if index + 1 < len(image_paths):
+                next_prefetch = asyncio.create_task(_prefetch_image(image_paths[index + 1]))
+            yield await _complete_analysis(current)
+    finally:
+        # The consumer stopped early; don't leave the prefetch running
+        if next_prefetch is not None:
+            next_prefetch.cancel()
 
 if __name__ == '__main__':
     import argparse
@@ -133,7 +659,7 @@ if __name__ == '__main__':
 
     if os.path.exists(args.image_path):
         print(f"Analysing local image: {args.image_path}")
-        analysis, ocr_text = analyse_image(args.image_path)
+        analysis, ocr_text = asyncio.run(analyse_image(args.image_path))
         
         print("\n--- OCR TEXT ---")
         print(ocr_text)